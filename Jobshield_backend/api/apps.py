@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        # Compile the pattern matchers and load the domain suffix list at startup
+        # instead of on the first request.
+        from .services import warm_up
+        warm_up()
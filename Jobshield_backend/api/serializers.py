@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .services import MAX_BATCH_LINKS
 
 class MessageAnalysisRequestSerializer(serializers.Serializer):
     message_text = serializers.CharField()
@@ -10,6 +11,9 @@ class MessageAnalysisResponseSerializer(serializers.Serializer):
     explanation = serializers.CharField()
     advice = serializers.CharField()
 
+class BulkMessageAnalysisRequestSerializer(serializers.Serializer):
+    messages = serializers.ListField(child=serializers.CharField(), allow_empty=False, max_length=100)
+
 class LinkAnalysisRequestSerializer(serializers.Serializer):
     url = serializers.URLField()
 
@@ -30,3 +34,30 @@ class EmailAnalysisResponseSerializer(serializers.Serializer):
     detected_patterns = serializers.ListField(child=serializers.CharField())
     explanation = serializers.CharField()
     advice = serializers.CharField()
+
+class BatchAnalysisItemSerializer(serializers.Serializer):
+    REQUIRED_FIELDS = {
+        "message": ("message_text",),
+        "link": ("url",),
+        "email": ("email_text", "sender_email"),
+    }
+
+    kind = serializers.ChoiceField(choices=list(REQUIRED_FIELDS))
+    message_text = serializers.CharField(required=False)
+    url = serializers.URLField(required=False)
+    email_text = serializers.CharField(required=False)
+    sender_email = serializers.EmailField(required=False)
+
+    def validate(self, data):
+        missing = [field for field in self.REQUIRED_FIELDS[data["kind"]] if field not in data]
+        if missing:
+            raise serializers.ValidationError({field: "This field is required." for field in missing})
+        return data
+
+class BatchAnalysisRequestSerializer(serializers.Serializer):
+    items = BatchAnalysisItemSerializer(many=True, allow_empty=False, max_length=100)
+
+    def validate_items(self, items):
+        if sum(item["kind"] == "link" for item in items) > MAX_BATCH_LINKS:
+            raise serializers.ValidationError(f"Ensure this field has no more than {MAX_BATCH_LINKS} link items.")
+        return items
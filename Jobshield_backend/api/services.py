@@ -1,8 +1,16 @@
+import codecs
+import hashlib
 import re
+import re2
 import requests
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import tldextract
+from cachetools import LRUCache, TTLCache, cached
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from threading import RLock
 
 # This service analyzes a given message text to detect scam patterns based on a set of predefined rules.
 # Each rule is associated with a specific pattern (keyword or regex), a weight, and a descriptive name.
@@ -21,6 +29,10 @@ from datetime import datetime
 # - 31-60: MEDIUM
 # - 61-100: HIGH
 
+# A single extractor is shared by every request. It uses the public suffix list bundled
+# with tldextract, so no HTTP fetch or disk cache is involved.
+_TLD = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
 # Pattern definitions
 SCAM_PATTERNS = [
     {
@@ -101,133 +113,106 @@ WEBSITE_SCAM_PATTERNS = [
 ]
 
 
-def analyze_message(message_text):
+def _build_matcher(patterns):
     """
-    Analyzes the message_text for scam patterns and returns a risk analysis.
+    Compiles the keywords of every pattern into one RE2 set, which scans a text once and
+    reports all the patterns whose keywords occur in it. Patterns with a regex keep it on
+    Python's re instead, as RE2's word characters and boundaries are ASCII only. Both
+    ignore case, so texts are matched as they are instead of being lowercased first.
+    Returns the compiled set, the bit of each entry of the set (1 << pattern index), and
+    the (compiled regex, bit) pairs.
     """
-    risk_score = 0
-    detected_patterns = []
-    explanations = []
-    advices = []
-
-    for pattern in SCAM_PATTERNS:
-        found = False
-        if pattern["regex"]:
-            if re.search(pattern["regex"], message_text, re.IGNORECASE):
-                found = True
-        else:
-            for keyword in pattern["keywords"]:
-                if keyword.lower() in message_text.lower():
-                    found = True
-                    break
-        
-        if found:
-            risk_score += pattern["weight"]
-            detected_patterns.append(pattern["name"])
-            explanations.append(pattern["explanation"])
-            advices.append(pattern["advice"])
+    options = re2.Options()
+    options.case_sensitive = False
+    pattern_set = re2.Set.SearchSet(options)
+    bits = []
+    regexes = []
+    for index, pattern in enumerate(patterns):
+        if pattern.get("regex"):
+            regexes.append((re.compile(pattern["regex"], re.IGNORECASE), 1 << index))
+        elif pattern.get("keywords"):
+            pattern_set.Add("|".join(re2.escape(keyword) for keyword in pattern["keywords"]))
+            bits.append(1 << index)
+    pattern_set.Compile()
+    return pattern_set, bits, regexes
+
+
+def _match_patterns(matcher, text):
+    """
+    Returns the bitmask of the patterns found in the text.
+    """
+    pattern_set, bits, regexes = matcher
+    hits = 0
+    for entry in pattern_set.Match(text) or ():
+        hits |= bits[entry]
+    for regex, bit in regexes:
+        if regex.search(text):
+            hits |= bit
+    return hits
 
-    # Cap the risk score at 100
-    risk_score = min(risk_score, 100)
 
-    if risk_score <= 30:
-        risk_level = "LOW"
-    elif risk_score <= 60:
-        risk_level = "MEDIUM"
-    else:
-        risk_level = "HIGH"
+def _digest(*texts):
+    """
+    Returns a fixed-size cache key for a tuple of texts of any length.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        data = text.encode("utf-8", "surrogatepass")
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+    return hasher.digest()
 
-    explanation = " ".join(explanations) if explanations else "No significant risk patterns were detected."
-    advice = " ".join(advices) if advices else "Always remain cautious and verify employer details."
 
-    return {
-        "risk_level": risk_level,
-        "risk_score": risk_score,
-        "detected_patterns": detected_patterns,
-        "explanation": explanation,
-        "advice": advice
-    }
+_SCAM_MATCHER = _build_matcher(SCAM_PATTERNS)
+_WEBSITE_MATCHER = _build_matcher(WEBSITE_SCAM_PATTERNS)
 
+_PatternTable = namedtuple("_PatternTable", ["names", "weights", "explanations", "advices"])
 
-def analyze_link(url):
+
+def _build_table(patterns):
     """
-    Analyzes a website for scam patterns.
+    Flattens a list of pattern dicts into parallel columns indexed by pattern position.
+    Matches are recorded as a bitmask (bit i set when pattern i matched).
     """
-    risk_score = 0
-    detected_patterns = []
-    explanations = []
-    advices = []
-
-    # 1. Check for HTTPS
-    if not url.startswith("https://"):
-        pattern = WEBSITE_SCAM_PATTERNS[0]
-        risk_score += pattern["weight"]
-        detected_patterns.append(pattern["name"])
-        explanations.append(pattern["explanation"])
-        advices.append(pattern["advice"])
+    return _PatternTable(
+        names=tuple(pattern["name"] for pattern in patterns),
+        weights=tuple(pattern["weight"] for pattern in patterns),
+        explanations=tuple(pattern["explanation"] for pattern in patterns),
+        advices=tuple(pattern["advice"] for pattern in patterns),
+    )
 
-    # 2. Fetch and parse website content
-    try:
-        content = _fetch_url_content(url)
-        text = _extract_text_from_html(content)
-    except (requests.exceptions.RequestException, ValueError) as e:
-        raise e
 
-    # 3. Analyze domain
-    try:
-        domain_info = tldextract.extract(url)
-        # For the purpose of this example, we will mock the domain age check.
-        # In a real application, you would use a WHOIS service to get the domain creation date.
-        domain_age_days = _get_domain_age_in_days(domain_info.registered_domain)
-        if domain_age_days < 90:  # 3 months
-            pattern = WEBSITE_SCAM_PATTERNS[1]
-            risk_score += pattern["weight"]
-            detected_patterns.append(pattern["name"])
-            explanations.append(pattern["explanation"])
-            advices.append(pattern["advice"])
-    except Exception:
-        # For now, we will ignore domain analysis errors
-        pass
+def _collect(table, hits):
+    """
+    Turns a bitmask of matched patterns into the total score and the lists of
+    pattern names, explanations and advices, in pattern order.
+    """
+    rows = [index for index in range(len(table.names)) if hits >> index & 1]
+    risk_score = sum(table.weights[index] for index in rows)
+    detected_patterns = [table.names[index] for index in rows]
+    explanations = [table.explanations[index] for index in rows]
+    advices = [table.advices[index] for index in rows]
+    return risk_score, detected_patterns, explanations, advices
 
 
-    # 4. Analyze text content
-    for pattern in WEBSITE_SCAM_PATTERNS[2:]:
-        found = False
-        if "keywords" in pattern:
-            for keyword in pattern["keywords"]:
-                if keyword.lower() in text.lower():
-                    found = True
-                    break
-        if found:
-            risk_score += pattern["weight"]
-            detected_patterns.append(pattern["name"])
-            explanations.append(pattern["explanation"])
-            advices.append(pattern["advice"])
+_MAX_RISK_SCORE = 100
 
-    # 5. Check for contact info (basic check)
-    if not re.search(r"(\bcontact\b|\baddress\b|\bphone\b)", text, re.IGNORECASE):
-        pattern = WEBSITE_SCAM_PATTERNS[3]
-        risk_score += pattern["weight"]
-        detected_patterns.append(pattern["name"])
-        explanations.append(pattern["explanation"])
-        advices.append(pattern["advice"])
+# Risk level for every possible (capped) score, see the risk levels above.
+_RISK_LEVEL = ("LOW",) * 31 + ("MEDIUM",) * 30 + ("HIGH",) * 40
 
 
+def _finalize(risk_score, detected_patterns, explanations, advices):
+    """
+    Caps the risk score and builds the analysis result shared by all analyzers.
+    """
     # Cap the risk score at 100
-    risk_score = min(risk_score, 100)
-
-    if risk_score <= 30:
-        risk_level = "LOW"
-    elif risk_score <= 60:
-        risk_level = "MEDIUM"
-    else:
-        risk_level = "HIGH"
+    risk_score = min(risk_score, _MAX_RISK_SCORE)
 
     explanation = " ".join(explanations) if explanations else "No significant risk patterns were detected."
     advice = " ".join(advices) if advices else "Always remain cautious and verify employer details."
 
     return {
-        "risk_level": risk_level,
+        "risk_level": _RISK_LEVEL[risk_score],
         "risk_score": risk_score,
         "detected_patterns": detected_patterns,
         "explanation": explanation,
@@ -235,389 +220,306 @@ def analyze_link(url):
     }
 
 
+_SCAM_TABLE = _build_table(SCAM_PATTERNS)
+_WEBSITE_TABLE = _build_table(WEBSITE_SCAM_PATTERNS)
 
+_CONTACT_RE = re.compile(r"\b(contact|address|phone)\b", re.IGNORECASE)
 
 
-EMAIL_SCAM_PATTERNS = [
+def analyze_message(message_text):
+    """
+    Analyzes the message_text for scam patterns and returns a risk analysis.
+    """
+    hits = _match_message(message_text)
+    return _finalize(*_collect(_SCAM_TABLE, hits))
 
 
-    {
+# The matches of recently seen texts are cached. Texts can be arbitrarily long, so they
+# are keyed by a digest rather than kept in the cache. The cached bitmasks are immutable;
+# every call still builds its own result dict from them.
+@cached(LRUCache(maxsize=4096), key=_digest, lock=RLock())
+def _match_message(message_text):
+    """
+    Returns the bitmask of the scam patterns found in a message.
+    """
+    return _match_patterns(_SCAM_MATCHER, message_text)
 
 
-        "name": "Free Email Domain",
+def analyze_messages(message_texts):
+    """
+    Analyzes several messages at once, reusing the compiled matchers for each of them.
+    """
+    return [analyze_message(message_text) for message_text in message_texts]
 
 
-        "weight": 40,
+def analyze_link(url):
+    """
+    Analyzes a website for scam patterns.
+    """
+    return _finish_link_analysis(*_start_link_analysis(url))
 
 
-        "domains": ["gmail.com", "yahoo.com", "outlook.com", "aol.com"],
+# Every link of a batch is fetched from the network, so a batch is limited to a few links
+# to bound how long it holds a worker and the shared executor.
+MAX_BATCH_LINKS = 8
 
 
-        "explanation": "The email was sent from a free email domain, which is uncommon for legitimate companies.",
+def analyze_links(urls):
+    """
+    Analyzes several websites at once. The network lookups of all the links are started
+    together so they overlap. Returns one entry per URL, in order: its analysis, or the
+    exception raised if the link could not be analyzed.
+    """
+    lookups = [_start_link_analysis(url) for url in urls]
+    results = []
+    for lookup in lookups:
+        try:
+            results.append(_finish_link_analysis(*lookup))
+        except Exception as e:
+            results.append(e)
+    return results
 
 
-        "advice": "Verify the sender's email address and cross-reference it with the company's official domain."
+def _start_link_analysis(url):
+    """
+    Runs the checks on the URL itself and starts the network lookups of a link.
+    """
+    # Fetching the page and looking up the domain age are independent network calls,
+    # so both are started right away and run concurrently with the rest of the analysis.
+    page_future = _EXECUTOR.submit(_match_page, url)
+    # 1. Check for HTTPS and extract the registered domain
+    hits, registered_domain = _link_features(url)
+    # For the purpose of this example, we will mock the domain age check.
+    # In a real application, you would use a WHOIS service to get the domain creation date.
+    domain_age_future = _EXECUTOR.submit(_get_domain_age_in_days, registered_domain)
+    return hits, page_future, domain_age_future
+
+
+def _finish_link_analysis(hits, page_future, domain_age_future):
+    """
+    Waits for the network lookups of a link and builds its analysis.
+    """
+    # 2. Fetch the website and analyze its content
+    try:
+        hits |= page_future.result()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        raise e
 
+    # 3. Analyze domain
+    try:
+        domain_age_days = domain_age_future.result()
+        if domain_age_days < 90:  # 3 months
+            hits |= 1 << 1
+    except Exception:
+        # For now, we will ignore domain analysis errors
+        pass
 
-    },
+    return _finalize(*_collect(_WEBSITE_TABLE, hits))
 
 
-    {
+@lru_cache(maxsize=8192)
+def _link_features(url):
+    """
+    Returns the bitmask of the website patterns matched by the URL itself, and the
+    URL's registered domain. Both depend on the URL alone, so they are cached per URL.
+    """
+    hits = 0
+    if not url.startswith("https://"):
+        hits |= 1 << 0
+    return hits, _TLD(url).registered_domain
 
 
+EMAIL_SCAM_PATTERNS = [
+    {
+        "name": "Free Email Domain",
+        "weight": 40,
+        "domains": frozenset({"gmail.com", "yahoo.com", "outlook.com", "aol.com"}),
+        "explanation": "The email was sent from a free email domain, which is uncommon for legitimate companies.",
+        "advice": "Verify the sender's email address and cross-reference it with the company's official domain."
+    },
+    {
         "name": "Payment Request",
-
-
         "weight": 50,
-
-
         "keywords": ["payment", "fee", "charge", "cost", "send money", "Ksh", "KES"],
-
-
         "explanation": "The email requests payment, which is a major red flag for job scams.",
-
-
         "advice": "Never send money for a job application or offer."
-
-
     },
-
-
     {
-
-
         "name": "Urgency Manipulation",
-
-
         "weight": 25,
-
-
         "keywords": ["urgent", "immediately", "now", "limited time", "act fast"],
-
-
         "explanation": "The email creates a sense of urgency to pressure you into making a quick decision.",
-
-
         "advice": "Take your time to evaluate any job offer. High-pressure tactics are suspicious."
-
-
     },
-
-
     {
-
-
         "name": "Poor Grammar / Unusual Formatting",
-
-
         "weight": 15,
-
-
+        # Basic grammar check (example). In a real application, a more sophisticated
+        # library could be used. For now, we'll just check for a few common mistakes.
+        "regex": r"\b(kindley|ur|pls)\b",
         "explanation": "The email contains grammatical errors or has unusual formatting, which can be a sign of a scam.",
-
-
         "advice": "Read emails carefully and be wary of unprofessional communication."
-
-
     }
-
-
 ]
 
-
-
-
-
-
+_EMAIL_MATCHER = _build_matcher(EMAIL_SCAM_PATTERNS)
+_EMAIL_TABLE = _build_table(EMAIL_SCAM_PATTERNS)
 
 
 def analyze_email(email_text, sender_email):
-
-
     """
-
-
     Analyzes an email for scam patterns.
-
-
     """
+    hits = _match_email(email_text, sender_email)
+    return _finalize(*_collect(_EMAIL_TABLE, hits))
 
 
-    risk_score = 0
-
-
-    detected_patterns = []
-
-
-    explanations = []
-
-
-    advices = []
-
-
-
-
-
+@cached(LRUCache(maxsize=4096), key=_digest, lock=RLock())
+def _match_email(email_text, sender_email):
+    """
+    Returns the bitmask of the scam patterns found in an email and its sender address.
+    """
     # 1. Analyze sender's email domain
+    hits = _match_sender_domain(sender_email.rpartition("@")[2].lower())
 
+    # 2. Analyze email content (keywords and common grammar mistakes)
+    hits |= _match_patterns(_EMAIL_MATCHER, email_text)
 
-    domain_info = tldextract.extract(sender_email)
+    return hits
 
 
+@lru_cache(maxsize=4096)
+def _match_sender_domain(host):
+    """
+    Returns the bitmask of the email patterns matched by a sender's domain. Senders come
+    from a small set of domains, so the lookup is cached per host.
+    """
+    domain_info = _TLD(host)
     domain = f"{domain_info.domain}.{domain_info.suffix}"
+    hits = 0
+    for index, pattern in enumerate(EMAIL_SCAM_PATTERNS):
+        if domain in pattern.get("domains", ()):
+            hits |= 1 << index
+    return hits
+
+
+# Outbound requests share one session so connections are reused, and results are cached
+# for a while so repeated submissions of the same URL or domain skip the network. Pages
+# are cached as their match bitmask, so an entry costs a few bytes rather than the page.
+_SESSION = requests.Session()
+_URL_CACHE = TTLCache(maxsize=4096, ttl=300)
+_DOMAIN_AGE_CACHE = TTLCache(maxsize=16384, ttl=86400)
+# Pages are read up to _MAX_CONTENT_BYTES, and pages announcing more than
+# _MAX_CONTENT_LENGTH are rejected without being downloaded.
+_MAX_CONTENT_BYTES = 512 * 1024
+_MAX_CONTENT_LENGTH = 5 * 1024 * 1024
+# Runs the network lookups of analyze_link concurrently.
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+# Charset declarations of a page, in its Content-Type header or in a <meta> tag, which
+# must appear within the first 1024 bytes.
+_HEADER_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+
+
+@cached(_URL_CACHE, lock=RLock())
+def _match_page(url):
+    """
+    Returns the bitmask of the website patterns found in the content of a page. Only the
+    bitmask is cached, not the page, so the cache stays small whatever the page size.
+    """
+    content, truncated = _fetch_url_content(url)
+    text = _extract_text_from_html(content)
 
+    # Analyze text content
+    hits = _match_patterns(_WEBSITE_MATCHER, text)
 
-    for pattern in EMAIL_SCAM_PATTERNS:
-
-
-        if "domains" in pattern:
-
-
-            if domain in pattern["domains"]:
-
-
-                risk_score += pattern["weight"]
-
-
-                detected_patterns.append(pattern["name"])
-
-
-                explanations.append(pattern["explanation"])
-
-
-                advices.append(pattern["advice"])
-
-
-
-
-
-    # 2. Analyze email content
-
-
-    for pattern in EMAIL_SCAM_PATTERNS:
-
-
-        if "keywords" in pattern:
-
-
-            for keyword in pattern["keywords"]:
-
-
-                if keyword.lower() in email_text.lower():
-
-
-                    risk_score += pattern["weight"]
-
-
-                    detected_patterns.append(pattern["name"])
-
-
-                    explanations.append(pattern["explanation"])
-
-
-                    advices.append(pattern["advice"])
-
-
-                    break 
-
-
-
-
-
-    # 3. Basic grammar check (example)
-
-
-    # In a real application, a more sophisticated library could be used.
-
-
-    # For now, we'll just check for a few common mistakes.
-
-
-    common_mistakes = ["kindley", "ur", "pls"]
-
-
-    for mistake in common_mistakes:
-
-
-        if mistake in email_text.lower():
-
-
-            pattern = EMAIL_SCAM_PATTERNS[3]
-
-
-            risk_score += pattern["weight"]
-
-
-            detected_patterns.append(pattern["name"])
-
-
-            explanations.append(pattern["explanation"])
-
-
-            advices.append(pattern["advice"])
-
-
-            break
-
-
-            
-
-
-
-
-
-    # Cap the risk score at 100
-
-
-    risk_score = min(risk_score, 100)
-
-
-
-
-
-    if risk_score <= 30:
-
-
-        risk_level = "LOW"
-
-
-    elif risk_score <= 60:
-
-
-        risk_level = "MEDIUM"
-
-
-    else:
-
-
-        risk_level = "HIGH"
-
-
-
-
-
-    explanation = " ".join(explanations) if explanations else "No significant risk patterns were detected."
-
-
-    advice = " ".join(advices) if advices else "Always remain cautious and verify employer details."
-
-
-
-
-
-    return {
-
-
-        "risk_level": risk_level,
-
-
-        "risk_score": risk_score,
-
-
-        "detected_patterns": list(set(detected_patterns)),
-
-
-        "explanation": explanation,
-
-
-        "advice": advice
-
-
-    }
-
-
-
-
-
+    # Check for contact info (basic check). Contact details usually sit at the end of a
+    # page, so a page cut off by the size limit is not penalized for lacking them.
+    if not truncated and not _CONTACT_RE.search(text):
+        hits |= 1 << 3
 
+    return hits
 
 
 def _fetch_url_content(url):
-
-
     """
-
-
-    Safely fetches the content of a URL.
-
-
+    Safely fetches the content of a URL. Returns the decoded content and whether it was
+    cut off at _MAX_CONTENT_BYTES.
     """
-
-
     try:
-
-
-        response = requests.get(url, timeout=5)
-
-
-        response.raise_for_status()  # Raise an exception for bad status codes
-
-
-        return response.content
-
-
+        with _SESSION.get(url, timeout=5, stream=True) as response:
+            response.raise_for_status()  # Raise an exception for bad status codes
+            content_length = response.headers.get("Content-Length", "")
+            if content_length.isdigit() and int(content_length) > _MAX_CONTENT_LENGTH:
+                raise ValueError("Could not fetch URL: the page is too large to analyze")
+            # Only the start of the page is read; it is enough to spot the scam patterns
+            # and bounds memory use and parse time on huge pages.
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > _MAX_CONTENT_BYTES:
+                    break
+            body = b"".join(chunks)[:_MAX_CONTENT_BYTES]
+            return _decode_html(body, response.headers.get("Content-Type", "")), size > _MAX_CONTENT_BYTES
     except requests.exceptions.RequestException as e:
-
-
         raise ValueError(f"Could not fetch URL: {e}")
 
-
-
-
+def _decode_html(body, content_type):
+    """
+    Decodes a page with the charset declared in its Content-Type header or <meta> tag.
+    Pages without a usable declaration are read as UTF-8, or as Windows-1252 if they are
+    not valid UTF-8, which is what browsers do.
+    """
+    match = _HEADER_CHARSET_RE.search(content_type)
+    encoding = match.group(1) if match else None
+    if encoding is None:
+        match = _META_CHARSET_RE.search(body, 0, 1024)
+        encoding = match.group(1).decode("ascii") if match else None
+    # Incremental decoders leave out a multi-byte character cut off by the size limit
+    # instead of failing on it.
+    if encoding:
+        try:
+            codec_info = codecs.lookup(encoding)
+            # Only text encodings are charsets. Codecs such as rot13, base64 or zlib are
+            # ignored, or a page could hide its text from the analysis.
+            if codec_info._is_text_encoding:
+                return codec_info.incrementaldecoder(errors="replace").decode(body)
+        except Exception:
+            pass  # Unknown or unusable charset, fall back to guessing
+    try:
+        return codecs.getincrementaldecoder("utf-8-sig")().decode(body)
+    except UnicodeDecodeError:
+        return body.decode("windows-1252", errors="replace")
 
 def _extract_text_from_html(html_content):
-
-
     """
-
-
     Extracts visible text from HTML content.
-
-
     """
-
-
-    soup = BeautifulSoup(html_content, "html.parser")
-
-
+    tree = LexborHTMLParser(html_content)
     # Remove script and style elements
+    for node in tree.css("script, style"):
+        node.decompose()
+    return tree.root.text(separator=" ", strip=True) if tree.root else ""
 
-
-    for script in soup(["script", "style"]):
-
-
-        script.decompose()
-
-
-    return soup.get_text(separator=" ", strip=True)
-
-
-
-
-
+@cached(_DOMAIN_AGE_CACHE, lock=RLock())
 def _get_domain_age_in_days(domain):
-
-
     """
-
-
     Mock function to get the age of a domain in days.
-
-
     In a real application, this would use a WHOIS service.
-
-
     """
-
-
     # For demonstration purposes, we'll return a fixed value.
-
-
     # To simulate a new domain, you could return a value less than 90.
-
-
     return 365
 
 
-
-
+def warm_up():
+    """
+    Runs the analyzers once on dummy input so the domain suffix list and the HTML parser
+    are loaded before the first request. The website fetch is skipped to stay offline.
+    """
+    analyze_message("warm-up")
+    analyze_email("warm-up", "warm-up@example.com")
+    _link_features("https://example.com")
+    _extract_text_from_html("<p>warm-up</p>")
@@ -1,6 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
+from .services import MAX_BATCH_LINKS, _extract_text_from_html, _fetch_url_content
+
+class MessageAnalysisAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_analyze_message_detects_patterns(self):
+        """
+        Test the message analysis endpoint with a message matching several patterns.
+        """
+        data = {"message_text": "URGENT: pay the registration FEE and chat with us on WhatsApp."}
+        response = self.client.post('/api/analyze-message', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['risk_level'], 'HIGH')
+        self.assertEqual(
+            response.data['detected_patterns'],
+            ["Payment Request", "Urgency Manipulation", "Off-Platform Communication"]
+        )
+
+    def test_analyze_message_no_patterns(self):
+        """
+        Test the message analysis endpoint with a harmless message.
+        """
+        data = {"message_text": "Thanks for applying, we will review your CV."}
+        response = self.client.post('/api/analyze-message', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['risk_level'], 'LOW')
+        self.assertEqual(response.data['risk_score'], 0)
+        self.assertEqual(response.data['detected_patterns'], [])
+
+    def test_analyze_message_non_ascii_words(self):
+        """
+        Test that the regex patterns treat non-ASCII letters as word characters.
+        """
+        response = self.client.post('/api/analyze-message', {"message_text": "Write to josé@gmail.com"}, format='json')
+        self.assertEqual(response.data['detected_patterns'], ["Free Email Recruiter"])
+
+        response = self.client.post('/api/analyze-message', {"message_text": "Contactez éwhatsapp"}, format='json')
+        self.assertEqual(response.data['detected_patterns'], [])
+
+class BulkMessageAnalysisAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_analyze_messages_success(self):
+        """
+        Test the bulk message analysis endpoint returns one result per message, in order.
+        """
+        data = {"messages": ["Pay the registration fee on WhatsApp.", "Thanks for applying, we will review your CV."]}
+        response = self.client.post('/api/analyze-messages', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[0]['detected_patterns'], ["Payment Request", "Off-Platform Communication"])
+        self.assertEqual(response.data[1]['risk_level'], 'LOW')
+
+    def test_analyze_messages_empty_list(self):
+        """
+        Test the bulk message analysis endpoint with an empty list.
+        """
+        response = self.client.post('/api/analyze-messages', {"messages": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 class LinkAnalysisAPITest(TestCase):
     def setUp(self):
@@ -35,6 +98,86 @@ class LinkAnalysisAPITest(TestCase):
         response = self.client.post('/api/analyze-link', {'url': url}, format='json')
         self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
 
+class PageHandler(BaseHTTPRequestHandler):
+    """
+    Serves the pages registered in the server's `pages` dict, by path.
+    """
+    def do_GET(self):
+        content_type, body, content_length = self.server.pages[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(content_length if content_length is not None else len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class LinkContentAPITest(TestCase):
+    """
+    Tests the link analysis endpoint against pages served by a local HTTP server.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+        cls.server.pages = {}
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def serve(self, path, body, content_type="text/html", content_length=None):
+        """
+        Serves a page on the local server and returns its URL.
+        """
+        self.server.pages[path] = (content_type, body, content_length)
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def test_analyze_link_ignores_non_text_charset(self):
+        """
+        Test that a page declaring a non-text codec as its charset is still analyzed.
+        """
+        url = self.serve("/rot13", b"<p>Pay the fee, guaranteed income</p>", "text/html; charset=rot13")
+        response = self.client.post('/api/analyze-link', {'url': url}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['detected_patterns'],
+            ["No HTTPS", "Payment Instructions in Text", "No Contact Info", "Unrealistic Promises"]
+        )
+
+    def test_analyze_link_truncated_page(self):
+        """
+        Test that a page cut off by the size limit is not penalized for missing contact info.
+        """
+        url = self.serve("/truncated", b"<p>" + b"Lorem ipsum " * 100000 + b"payment contact</p>")
+        response = self.client.post('/api/analyze-link', {'url': url}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['detected_patterns'], ["No HTTPS"])
+
+    def test_analyze_link_too_large_page(self):
+        """
+        Test that a page announcing more than 5 MB is rejected without being downloaded.
+        """
+        url = self.serve("/huge", b"", content_length=6 * 1024 * 1024)
+        response = self.client.post('/api/analyze-link', {'url': url}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_fetch_windows_1252_page(self):
+        """
+        Test that a page is decoded with the charset declared in its <meta> tag.
+        """
+        body = '<html><head><meta charset="windows-1252"></head><body>café fee</body></html>'.encode("cp1252")
+        content, truncated = _fetch_url_content(self.serve("/cp1252", body))
+        self.assertEqual(_extract_text_from_html(content), "café fee")
+        self.assertFalse(truncated)
+
 class EmailAnalysisAPITest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -55,6 +198,35 @@ class EmailAnalysisAPITest(TestCase):
         self.assertIn('explanation', response.data)
         self.assertIn('advice', response.data)
 
+    def test_analyze_email_counts_each_pattern_once(self):
+        """
+        Test that several keywords of the same pattern are scored and reported once.
+        """
+        data = {
+            "email_text": "Please pay the fee and the charge, total cost KES 1500.",
+            "sender_email": "hr.company@gmail.com"
+        }
+        response = self.client.post('/api/analyze-email', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['risk_score'], 90)
+        self.assertEqual(response.data['detected_patterns'], ["Free Email Domain", "Payment Request"])
+
+    def test_analyze_email_grammar_check_uses_word_boundaries(self):
+        """
+        Test that common mistakes are only flagged as whole words.
+        """
+        data = {
+            "email_text": "Thank you for your application, we will be in touch.",
+            "sender_email": "hr@techcorp.com"
+        }
+        response = self.client.post('/api/analyze-email', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['detected_patterns'], [])
+
+        data["email_text"] = "Pls send ur CV."
+        response = self.client.post('/api/analyze-email', data, format='json')
+        self.assertEqual(response.data['detected_patterns'], ["Poor Grammar / Unusual Formatting"])
+
     def test_analyze_email_missing_sender(self):
         """
         Test the email analysis endpoint with a missing sender_email.
@@ -74,4 +246,40 @@ class EmailAnalysisAPITest(TestCase):
             "sender_email": "not-an-email"
         }
         response = self.client.post('/api/analyze-email', data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class BatchAnalysisAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_analyze_batch_success(self):
+        """
+        Test the batch analysis endpoint with one item of each kind.
+        """
+        data = {"items": [
+            {"kind": "message", "message_text": "Pay the registration fee on WhatsApp."},
+            {"kind": "email", "email_text": "Please pay KES 1500.", "sender_email": "hr.company@gmail.com"},
+            {"kind": "link", "url": "http://localhost:9999"},
+        ]}
+        response = self.client.post('/api/analyze-batch', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[0]['detected_patterns'], ["Payment Request", "Off-Platform Communication"])
+        self.assertEqual(response.data[1]['detected_patterns'], ["Free Email Domain", "Payment Request"])
+        self.assertIn('error', response.data[2])
+
+    def test_analyze_batch_missing_field(self):
+        """
+        Test the batch analysis endpoint with an item missing a field its kind requires.
+        """
+        data = {"items": [{"kind": "email", "email_text": "Please pay KES 1500."}]}
+        response = self.client.post('/api/analyze-batch', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_analyze_batch_too_many_links(self):
+        """
+        Test the batch analysis endpoint with more link items than a batch allows.
+        """
+        data = {"items": [{"kind": "link", "url": f"http://localhost:9999/{index}"} for index in range(MAX_BATCH_LINKS + 1)]}
+        response = self.client.post('/api/analyze-batch', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import MessageAnalysisView, LinkAnalysisView, EmailAnalysisView
+from .views import MessageAnalysisView, BulkMessageAnalysisView, LinkAnalysisView, EmailAnalysisView, BatchAnalysisView
 
 urlpatterns = [
     path('analyze-message', MessageAnalysisView.as_view(), name='analyze-message'),
+    path('analyze-messages', BulkMessageAnalysisView.as_view(), name='analyze-messages'),
     path('analyze-link', LinkAnalysisView.as_view(), name='analyze-link'),
     path('analyze-email', EmailAnalysisView.as_view(), name='analyze-email'),
+    path('analyze-batch', BatchAnalysisView.as_view(), name='analyze-batch'),
 ]
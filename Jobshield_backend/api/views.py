@@ -1,8 +1,8 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import MessageAnalysisRequestSerializer, MessageAnalysisResponseSerializer, LinkAnalysisRequestSerializer, LinkAnalysisResponseSerializer, EmailAnalysisRequestSerializer, EmailAnalysisResponseSerializer
-from .services import analyze_message, analyze_link, analyze_email
+from .serializers import MessageAnalysisRequestSerializer, MessageAnalysisResponseSerializer, BulkMessageAnalysisRequestSerializer, LinkAnalysisRequestSerializer, LinkAnalysisResponseSerializer, EmailAnalysisRequestSerializer, EmailAnalysisResponseSerializer, BatchAnalysisRequestSerializer
+from .services import analyze_message, analyze_messages, analyze_link, analyze_links, analyze_email
 
 class MessageAnalysisView(APIView):
     """
@@ -17,6 +17,19 @@ class MessageAnalysisView(APIView):
             return Response(response_serializer.data)
         return Response(request_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class BulkMessageAnalysisView(APIView):
+    """
+    API endpoint to analyze several messages for scam patterns in one request.
+    """
+    def post(self, request, *args, **kwargs):
+        request_serializer = BulkMessageAnalysisRequestSerializer(data=request.data)
+        if request_serializer.is_valid():
+            messages = request_serializer.validated_data['messages']
+            analysis_results = analyze_messages(messages)
+            response_serializer = MessageAnalysisResponseSerializer(analysis_results, many=True)
+            return Response(response_serializer.data)
+        return Response(request_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
 class LinkAnalysisView(APIView):
     """
     API endpoint to analyze a website link for scam patterns.
@@ -48,4 +61,32 @@ class EmailAnalysisView(APIView):
                 return Response(response_serializer.data)
             except Exception as e:
                 return Response({"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-        return Response(request_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(request_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class BatchAnalysisView(APIView):
+    """
+    API endpoint to analyze a mix of messages, links and emails in one request.
+    Items that cannot be analyzed get an error entry instead of failing the whole batch.
+    """
+    def post(self, request, *args, **kwargs):
+        request_serializer = BatchAnalysisRequestSerializer(data=request.data)
+        if request_serializer.is_valid():
+            items = request_serializer.validated_data['items']
+            # The links are analyzed together so their pages are fetched concurrently.
+            link_results = iter(analyze_links([item['url'] for item in items if item['kind'] == 'link']))
+            return Response([self.analyze_item(item, link_results) for item in items])
+        return Response(request_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def analyze_item(item, link_results):
+        try:
+            if item['kind'] == 'message':
+                return MessageAnalysisResponseSerializer(analyze_message(item['message_text'])).data
+            if item['kind'] == 'link':
+                analysis_result = next(link_results)
+                if isinstance(analysis_result, Exception):
+                    raise analysis_result
+                return LinkAnalysisResponseSerializer(analysis_result).data
+            return EmailAnalysisResponseSerializer(analyze_email(item['email_text'], item['sender_email'])).data
+        except Exception as e:
+            return {"error": str(e)}